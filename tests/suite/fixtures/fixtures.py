@@ -1,5 +1,6 @@
 """Describe project shared pytest fixtures."""
 
+import glob
 import os
 import subprocess
 import time
@@ -35,6 +36,11 @@ from suite.utils.resources_utils import (
     wait_before_test,
     wait_for_public_ip,
 )
+from suite.utils.vs_vsr_resources_utils import (
+    configure_client,
+    install_fast_json,
+    preload_manifests,
+)
 from suite.utils.yaml_utils import get_name_from_yaml
 
 
@@ -141,6 +147,18 @@ def test_namespace(kube_apis) -> str:
     return namespace
 
 
+@pytest.fixture(scope="session", autouse=True)
+def preloaded_manifests() -> int:
+    """
+    Parse the test data VS/VSR manifests once per session, before any test reads them.
+
+    :return: int number of manifests loaded
+    """
+    loaded = preload_manifests(glob.iglob(f"{TEST_DATA}/**/*.yaml", recursive=True))
+    print(f"Preloaded {loaded} manifests")
+    return loaded
+
+
 @pytest.fixture(scope="session", autouse=True)
 def delete_test_namespaces(kube_apis, request) -> None:
     """
@@ -292,7 +310,7 @@ def kube_apis(cli_arguments) -> KubeApis:
     apps_v1_api = client.AppsV1Api()
     rbac_v1 = client.RbacAuthorizationV1Api()
     api_extensions_v1 = client.ApiextensionsV1Api()
-    custom_objects = client.CustomObjectsApi()
+    custom_objects = client.CustomObjectsApi(install_fast_json(configure_client(client.ApiClient())))
     return KubeApis(v1, networking_v1, apps_v1_api, rbac_v1, api_extensions_v1, custom_objects)
 
 
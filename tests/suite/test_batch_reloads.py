@@ -36,7 +36,7 @@ from suite.utils.resources_utils import (
 from suite.utils.vs_vsr_resources_utils import (
     create_custom_items_from_yaml,
     create_virtual_server,
-    delete_virtual_server,
+    delete_virtual_servers,
     patch_virtual_server_from_yaml,
 )
 from suite.utils.yaml_utils import get_first_ingress_host_from_yaml
@@ -330,8 +330,9 @@ class TestVirtualServer:
         reload_ms = get_last_reload_time(virtual_server_setup.metrics_url, "nginx")
         print(f"last reload duration: {reload_ms} ms; total new reloads: {new_reloads}")
 
-        for i in range(1, total_vs + 1):
-            delete_virtual_server(kube_apis.custom_objects, f"virtual-server-{i}", test_namespace)
+        delete_virtual_servers(
+            kube_apis.custom_objects, [f"virtual-server-{i}" for i in range(1, total_vs + 1)], test_namespace
+        )
 
 
 ##############################################################################################################
@@ -470,8 +471,9 @@ class TestAppProtectWAFPolicyVS:
         reload_ms = get_last_reload_time(virtual_server_setup.metrics_url, "nginx")
         print(f"last reload duration: {reload_ms} ms")
 
-        for i in range(1, total_vs + 1):
-            delete_virtual_server(kube_apis.custom_objects, f"virtual-server-{i}", test_namespace)
+        delete_virtual_servers(
+            kube_apis.custom_objects, [f"virtual-server-{i}" for i in range(1, total_vs + 1)], test_namespace
+        )
         delete_policy(kube_apis.custom_objects, "waf-policy", test_namespace)
 
 
@@ -36,7 +36,7 @@ from suite.utils.resources_utils import (
 from suite.utils.vs_vsr_resources_utils import (
     create_v_s_route,
     create_virtual_server,
-    delete_virtual_server,
+    delete_virtual_servers,
     patch_virtual_server_from_yaml,
 )
 from suite.utils.yaml_utils import get_first_ingress_host_from_yaml
@@ -334,8 +334,9 @@ class TestVirtualServer:
             and get_last_reload_status(virtual_server_setup.metrics_url, "nginx") == "1"
         )
 
-        for i in range(1, total_vs + 1):
-            delete_virtual_server(kube_apis.custom_objects, f"virtual-server-{i}", test_namespace)
+        delete_virtual_servers(
+            kube_apis.custom_objects, [f"virtual-server-{i}" for i in range(1, total_vs + 1)], test_namespace
+        )
 
         assert num is None
 
@@ -478,8 +479,9 @@ class TestAppProtectWAFPolicyVS:
             and get_last_reload_status(virtual_server_setup.metrics_url, "nginx") == "1"
         )
 
-        for i in range(1, total_vs + 1):
-            delete_virtual_server(kube_apis.custom_objects, f"virtual-server-{i}", test_namespace)
+        delete_virtual_servers(
+            kube_apis.custom_objects, [f"virtual-server-{i}" for i in range(1, total_vs + 1)], test_namespace
+        )
         delete_policy(kube_apis.custom_objects, "waf-policy", test_namespace)
 
         assert num is None
@@ -1,7 +1,9 @@
-import os
+import contextlib
 import subprocess
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pytest
 import requests
 from settings import TEST_DATA
@@ -16,10 +18,14 @@ from suite.utils.custom_resources_utils import (
 from suite.utils.dos_utils import (
     check_learning_status_with_admd_s,
     clean_good_bad_clients,
-    find_in_log,
+    find_any,
     log_content_to_dic,
+    stop_clients,
+    wait_for_log_pattern,
+    wait_for_ready_units,
 )
 from suite.utils.resources_utils import (
+    append_to_jsonl,
     clear_file_contents,
     create_dos_arbitrator,
     create_example_app,
@@ -30,17 +36,18 @@ from suite.utils.resources_utils import (
     delete_items_from_yaml,
     ensure_connection_to_public_endpoint,
     ensure_response_from_backend,
-    get_file_contents,
+    get_file_contents_since,
     get_ingress_nginx_template_conf,
     get_nginx_template_conf,
+    get_pod_name_with_label,
     get_pods_amount_with_name,
     get_test_file_name,
     nginx_reload,
     replace_configmap_from_yaml,
     scale_deployment,
     wait_before_test,
+    wait_until_200,
     wait_until_all_pods_are_ready,
-    write_to_json,
 )
 from suite.utils.yaml_utils import get_first_ingress_host_from_yaml
 
@@ -49,7 +56,7 @@ valid_resp_addr = "Server address:"
 valid_resp_name = "Server name:"
 invalid_resp_title = "Request Rejected"
 invalid_resp_body = "The requested URL was rejected. Please consult with your administrator."
-reload_times = {}
+ic_pod_selector = "app=nginx-ingress"
 
 
 class DosSetup:
@@ -69,6 +76,23 @@ class DosSetup:
         self.log_name = log_name
 
 
+class DosLearnedState:
+    """
+    Encapsulate the result of a finished learning phase.
+    Attributes:
+        ingress_host (str):
+        syslog_pod (str):
+        log_contents (str): syslog contents up to the end of the learning phase
+        good_client (subprocess.Popen): good clients traffic, kept running until teardown
+    """
+
+    def __init__(self, ingress_host, syslog_pod, log_contents, good_client):
+        self.ingress_host = ingress_host
+        self.syslog_pod = syslog_pod
+        self.log_contents = log_contents
+        self.good_client = good_client
+
+
 @pytest.fixture(scope="class")
 def dos_setup(
     request, kube_apis, ingress_controller_endpoint, ingress_controller_prerequisites, test_namespace
@@ -123,19 +147,35 @@ def dos_setup(
         kube_apis.custom_objects, src_protected_yaml, test_namespace, ingress_controller_prerequisites.namespace
     )
 
-    for item in kube_apis.v1.list_namespaced_pod(ingress_controller_prerequisites.namespace).items:
-        if "nginx-ingress" in item.metadata.name:
-            nginx_reload(kube_apis.v1, item.metadata.name, ingress_controller_prerequisites.namespace)
+    ic_pods = kube_apis.v1.list_namespaced_pod(
+        ingress_controller_prerequisites.namespace,
+        label_selector=ic_pod_selector,
+        field_selector="status.phase=Running",
+        resource_version="0",
+    ).items
+    reload_file = f"reload-{get_test_file_name(request.node.fspath)}.jsonl"
+
+    def reload(pod):
+        before = time.monotonic()
+        nginx_reload(kube_apis.v1, pod.metadata.name, ingress_controller_prerequisites.namespace)
+        reload_ms = int((time.monotonic() - before) * 1000)
+        append_to_jsonl(reload_file, {"ts": time.time(), "name": pod.metadata.name, "ms": reload_ms})
+
+    with ThreadPoolExecutor(max_workers=max(1, len(ic_pods))) as executor:
+        list(executor.map(reload, ic_pods))
 
     def fin():
         if request.config.getoption("--skip-fixture-teardown") == "no":
             print("Clean up:")
-            delete_dos_policy(kube_apis.custom_objects, pol_name, test_namespace)
-            delete_dos_logconf(kube_apis.custom_objects, log_name, test_namespace)
-            delete_dos_protected(kube_apis.custom_objects, protected_name, test_namespace)
-            delete_common_app(kube_apis, "dos", test_namespace)
-            delete_items_from_yaml(kube_apis, src_sec_yaml, test_namespace)
-            write_to_json(f"reload-{get_test_file_name(request.node.fspath)}.json", reload_times)
+            deletes = [
+                lambda: delete_dos_policy(kube_apis.custom_objects, pol_name, test_namespace),
+                lambda: delete_dos_logconf(kube_apis.custom_objects, log_name, test_namespace),
+                lambda: delete_dos_protected(kube_apis.custom_objects, protected_name, test_namespace),
+                lambda: delete_common_app(kube_apis, "dos", test_namespace),
+                lambda: delete_items_from_yaml(kube_apis, src_sec_yaml, test_namespace),
+            ]
+            with ThreadPoolExecutor(max_workers=len(deletes)) as executor:
+                list(executor.map(lambda delete: delete(), deletes))
             clean_good_bad_clients()
 
     request.addfinalizer(fin)
@@ -143,8 +183,177 @@ def dos_setup(
     return DosSetup(req_url, protected_name, pol_name, log_name)
 
 
+@pytest.fixture(scope="class")
+def dos_pods(kube_apis, ingress_controller_prerequisites, crd_ingress_controller_with_dos, dos_setup) -> dict:
+    """
+    Resolve the names of the pods used by the DOS tests once per class.
+
+    :param kube_apis: client apis
+    :param ingress_controller_prerequisites: IC pre-requisites
+    :param crd_ingress_controller_with_dos: IC with DOS enabled
+    :param dos_setup: DosSetup
+    :return: dict with "nginx", "syslog" and "accesslog" pod names
+    """
+    ns = ingress_controller_prerequisites.namespace
+    return {
+        "nginx": get_pod_name_with_label(kube_apis.v1, ns, ic_pod_selector),
+        "syslog": get_pod_name_with_label(kube_apis.v1, ns, "app=syslog"),
+        "accesslog": get_pod_name_with_label(kube_apis.v1, ns, "app=accesslog"),
+    }
+
+
+@pytest.fixture(scope="class")
+def dos_ingress(request, kube_apis, crd_ingress_controller_with_dos, dos_setup, test_namespace) -> str:
+    """
+    Deploy the DOS ingress once per class, all the tests use the same ingress for the same protected resource.
+
+    :param request: pytest fixture
+    :param kube_apis: client apis
+    :param crd_ingress_controller_with_dos: IC with DOS enabled
+    :param dos_setup: DosSetup
+    :param test_namespace:
+    :return: str ingress host
+    """
+    print("------------------------- Deploy ingress -----------------------------")
+    create_ingress_with_dos_annotations(kube_apis, src_ing_yaml, test_namespace, test_namespace + "/dos-protected")
+
+    def fin():
+        if request.config.getoption("--skip-fixture-teardown") == "no":
+            print("Delete ingress:")
+            delete_items_from_yaml(kube_apis, src_ing_yaml, test_namespace)
+
+    request.addfinalizer(fin)
+
+    return get_first_ingress_host_from_yaml(src_ing_yaml)
+
+
+@pytest.fixture(scope="class")
+def learned_state(
+    request,
+    kube_apis,
+    ingress_controller_prerequisites,
+    crd_ingress_controller_with_dos,
+    dos_setup,
+    dos_pods,
+    dos_ingress,
+) -> DosLearnedState:
+    """
+    Start good clients traffic and run the learning phase once per class.
+
+    :param request: pytest fixture
+    :param kube_apis: client apis
+    :param ingress_controller_prerequisites: IC pre-requisites
+    :param crd_ingress_controller_with_dos: IC with DOS enabled
+    :param dos_setup: DosSetup
+    :param dos_pods: DOS pod names
+    :param dos_ingress: ingress host
+    :return: DosLearnedState
+    """
+    ns = ingress_controller_prerequisites.namespace
+    log_loc = f"/var/log/messages"
+    syslog_pod = dos_pods["syslog"]
+    assert "syslog" in syslog_pod
+    clear_file_contents(kube_apis.v1, log_loc, syslog_pod, ns)
+
+    ingress_host = dos_ingress
+
+    print("------------------------- Learning Phase -----------------------------")
+    print("start good clients requests")
+    p_good_client = subprocess.Popen(
+        [f"{TEST_DATA}/dos/good_clients_xff.sh", ingress_host, dos_setup.req_url],
+        start_new_session=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    def fin():
+        print("Stop Good Client")
+        stop_clients(p_good_client)
+
+    request.addfinalizer(fin)
+
+    print("Learning for max 15 minutes")
+    log_contents = wait_for_log_pattern(kube_apis.v1, syslog_pod, ns, log_loc, 'learning_confidence="Ready"', 900)
+    check_learning_status_with_admd_s(kube_apis, dos_pods["nginx"], ns, 900)
+
+    return DosLearnedState(ingress_host, syslog_pod, log_contents, p_good_client)
+
+
+@contextlib.contextmanager
+def arbitrator_in_namespace(kube_apis, ic_namespace, config_map_name):
+    """
+    Move the dos arbitrator from the IC namespace to its own namespace and back on exit.
+
+    Both moves touch independent objects in two namespaces, so they run concurrently; the ConfigMap pointing
+    the IC at the arbitrator is replaced after each move.
+
+    :param kube_apis: client apis
+    :param ic_namespace: IC namespace
+    :param config_map_name: IC ConfigMap name
+    :return: str arbitrator namespace
+    """
+    arbitrator_ns_yaml = f"{TEST_DATA}/dos/arbitrator_ns.yaml"
+    arb_yaml = f"{TEST_DATA}/dos/appprotect-dos-arb.yaml"
+    arb_svc_yaml = f"{TEST_DATA}/dos/appprotect-dos-arb-svc.yaml"
+
+    def create_in_arbitrator_ns():
+        print("------------------------- Create dos arbitrator in arbitrator namespace -----------------------")
+        namespace = create_items_from_yaml(kube_apis, arbitrator_ns_yaml, "")["Namespace"]
+        create_dos_arbitrator(kube_apis.v1, kube_apis.apps_v1_api, namespace, arb_yaml, arb_svc_yaml)
+        return namespace
+
+    print("Remove dos arbitrator from namespace: ", ic_namespace)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        removed = executor.submit(
+            delete_dos_arbitrator, kube_apis.v1, kube_apis.apps_v1_api, "appprotect-dos-arb", ic_namespace
+        )
+        created = executor.submit(create_in_arbitrator_ns)
+        removed.result()
+        arbitrator_ns = created.result()
+
+    print(f"------------- Replace ConfigMap --------------")
+    replace_configmap_from_yaml(
+        kube_apis.v1, config_map_name, ic_namespace, f"{TEST_DATA}/dos/nginx-config-arb-dif-ns.yaml"
+    )
+    try:
+        yield arbitrator_ns
+    finally:
+        print("------------------------- Restore dos arbitrator in nginx namespace -----------------------")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            deleted = executor.submit(delete_items_from_yaml, kube_apis, arbitrator_ns_yaml, "")
+            restored = executor.submit(
+                create_dos_arbitrator, kube_apis.v1, kube_apis.apps_v1_api, ic_namespace, arb_yaml, arb_svc_yaml
+            )
+            deleted.result()
+            restored.result()
+
+        print(f"------------- Restore ConfigMap --------------")
+        replace_configmap_from_yaml(kube_apis.v1, config_map_name, ic_namespace, f"{TEST_DATA}/dos/nginx-config.yaml")
+
+
+@pytest.fixture
+def arbitrator_different_ns(kube_apis, ingress_controller_prerequisites, crd_ingress_controller_with_dos, dos_setup):
+    """
+    Run a test with the dos arbitrator in its own namespace.
+
+    :param kube_apis: client apis
+    :param ingress_controller_prerequisites: IC pre-requisites
+    :param crd_ingress_controller_with_dos: IC with DOS enabled
+    :param dos_setup: DosSetup
+    :return: str arbitrator namespace
+    """
+    with arbitrator_in_namespace(
+        kube_apis,
+        ingress_controller_prerequisites.namespace,
+        ingress_controller_prerequisites.config_map["metadata"]["name"],
+    ) as arbitrator_ns:
+        yield arbitrator_ns
+
+
 @pytest.mark.dos
 @pytest.mark.dos_ingress
+# both classes deploy the IC, CRDs, syslog/accesslog and arbitrator into the one shared IC namespace
+@pytest.mark.xdist_group(name="dos")
 @pytest.mark.parametrize(
     "crd_ingress_controller_with_dos",
     [
@@ -160,14 +369,15 @@ def dos_setup(
     indirect=["crd_ingress_controller_with_dos"],
 )
 class TestDos:
-    def getPodNameThatContains(self, kube_apis, namespace, contains_string):
-        for item in kube_apis.v1.list_namespaced_pod(namespace).items:
-            if contains_string in item.metadata.name:
-                return item.metadata.name
-        return ""
-
     def test_ap_nginx_config_entries(
-        self, kube_apis, ingress_controller_prerequisites, crd_ingress_controller_with_dos, dos_setup, test_namespace
+        self,
+        kube_apis,
+        ingress_controller_prerequisites,
+        crd_ingress_controller_with_dos,
+        dos_setup,
+        dos_pods,
+        dos_ingress,
+        test_namespace,
     ):
         """
         Test to verify Dos directive in nginx config
@@ -187,17 +397,9 @@ class TestDos:
 
         conf_nginx_directive = ["app_protect_dos_api on;", "location = /dashboard-dos.html"]
 
-        create_ingress_with_dos_annotations(
-            kube_apis,
-            src_ing_yaml,
-            test_namespace,
-            test_namespace + "/dos-protected",
-        )
-
-        ingress_host = get_first_ingress_host_from_yaml(src_ing_yaml)
-        ensure_response_from_backend(dos_setup.req_url, ingress_host, check404=True)
+        ensure_response_from_backend(dos_setup.req_url, dos_ingress, check404=True)
 
-        pod_name = self.getPodNameThatContains(kube_apis, ingress_controller_prerequisites.namespace, "nginx-ingress")
+        pod_name = dos_pods["nginx"]
 
         result_conf = get_ingress_nginx_template_conf(
             kube_apis.v1, test_namespace, "dos-ingress", pod_name, "nginx-ingress"
@@ -205,13 +407,14 @@ class TestDos:
 
         nginx_config = get_nginx_template_conf(kube_apis.v1, ingress_controller_prerequisites.namespace, pod_name)
 
-        delete_items_from_yaml(kube_apis, src_ing_yaml, test_namespace)
+        # one pass over each config, all the missing directives are reported at once
+        found = find_any(result_conf, conf_directive)
+        missing = [d for d in conf_directive if d not in found]
+        assert not missing, missing
 
-        for _ in conf_directive:
-            assert _ in result_conf
-
-        for _ in conf_nginx_directive:
-            assert _ in nginx_config
+        found = find_any(nginx_config, conf_nginx_directive)
+        missing = [d for d in conf_nginx_directive if d not in found]
+        assert not missing, missing
 
     def test_dos_sec_logs_on(
         self,
@@ -219,85 +422,75 @@ class TestDos:
         ingress_controller_prerequisites,
         crd_ingress_controller_with_dos,
         dos_setup,
+        dos_pods,
+        dos_ingress,
         test_namespace,
     ):
         """
         Test corresponding log entries with correct policy (includes setting up a syslog server as defined in syslog.yaml)
         """
         print("----------------------- Get syslog pod name ----------------------")
-        syslog_pod = self.getPodNameThatContains(kube_apis, ingress_controller_prerequisites.namespace, "syslog")
+        syslog_pod = dos_pods["syslog"]
         assert "syslog" in syslog_pod
 
         log_loc = f"/var/log/messages"
         clear_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
 
-        create_ingress_with_dos_annotations(kube_apis, src_ing_yaml, test_namespace, test_namespace + "/dos-protected")
-        ingress_host = get_first_ingress_host_from_yaml(src_ing_yaml)
-
         print("--------- Run test while DOS module is enabled with correct policy ---------")
 
-        ensure_response_from_backend(dos_setup.req_url, ingress_host, check404=True)
-        pod_name = self.getPodNameThatContains(kube_apis, ingress_controller_prerequisites.namespace, "nginx-ingress")
-
-        get_ingress_nginx_template_conf(kube_apis.v1, test_namespace, "dos-ingress", pod_name, "nginx-ingress")
+        ensure_response_from_backend(dos_setup.req_url, dos_ingress, check404=True)
 
         print("----------------------- Send request ----------------------")
-        wait_before_test(5)
+        wait_until_200(dos_setup.req_url, "dos.example.com")
         response = requests.get(dos_setup.req_url, headers={"host": "dos.example.com"}, verify=False)
         print(response.text)
 
         print(f"log_loc {log_loc} syslog_pod {syslog_pod} namespace {ingress_controller_prerequisites.namespace}")
 
-        log_contents = ""
-        retry = 0
-        while 'product="app-protect-dos"' not in log_contents and retry < 20:
-            wait_before_test(1)
-            log_contents = get_file_contents(
-                kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace, print_log=False
-            )
-            retry += 1
+        log_contents = wait_for_log_pattern(
+            kube_apis.v1,
+            syslog_pod,
+            ingress_controller_prerequisites.namespace,
+            log_loc,
+            'product="app-protect-dos"',
+            20,
+        )
 
         print(log_contents)
 
-        delete_items_from_yaml(kube_apis, src_ing_yaml, test_namespace)
-
-        assert f'vs_name="{test_namespace}/dos-protected/name"' in log_contents
-        assert "bad_actor" in log_contents
+        expected = {f'vs_name="{test_namespace}/dos-protected/name"', "bad_actor"}
+        missing = expected - find_any(log_contents, expected)
+        assert not missing, missing
 
     def test_dos_allowlist(
-        self, kube_apis, ingress_controller_prerequisites, crd_ingress_controller_with_dos, dos_setup, test_namespace
+        self,
+        kube_apis,
+        ingress_controller_prerequisites,
+        crd_ingress_controller_with_dos,
+        dos_setup,
+        dos_pods,
+        dos_ingress,
     ):
         """
         Test App Protect Dos: Block bad clients attack with learning
         """
         log_loc = f"/var/log/messages"
         print("----------------------- Get accesslog pod name ----------------------")
-        accesslog_pod = self.getPodNameThatContains(kube_apis, ingress_controller_prerequisites.namespace, "accesslog")
+        accesslog_pod = dos_pods["accesslog"]
         assert "accesslog" in accesslog_pod
         clear_file_contents(kube_apis.v1, log_loc, accesslog_pod, ingress_controller_prerequisites.namespace)
         print(f"log_loc {log_loc} syslog_pod {accesslog_pod} namespace {ingress_controller_prerequisites.namespace}")
 
-        print("------------------------- Deploy ingress -----------------------------")
-        create_ingress_with_dos_annotations(kube_apis, src_ing_yaml, test_namespace, test_namespace + "/dos-protected")
-        get_first_ingress_host_from_yaml(src_ing_yaml)
-
         print("----------------------- Send request to check allowlist ----------------------")
-        wait_before_test(5)
+        wait_until_200(dos_setup.req_url, "dos.example.com")
         response = requests.get(
             dos_setup.req_url, headers={"host": "dos.example.com", "X-Forwarded-For": "10.10.10.10"}, verify=False
         )
         print(response.text)
 
-        retry = 0
-        log_contents = ""
-        while 'reason=AllowList"' not in log_contents and retry < 20:
-            wait_before_test(1)
-            log_contents = get_file_contents(
-                kube_apis.v1, log_loc, accesslog_pod, ingress_controller_prerequisites.namespace, print_log=False
-            )
-            retry += 1
-
-        delete_items_from_yaml(kube_apis, src_ing_yaml, test_namespace)
+        log_contents = wait_for_log_pattern(
+            kube_apis.v1, accesslog_pod, ingress_controller_prerequisites.namespace, log_loc, "reason=Allowlist", 20
+        )
 
         print(log_contents)
 
@@ -305,116 +498,82 @@ class TestDos:
 
     @pytest.mark.dos_learning
     def test_dos_under_attack_with_learning(
-        self, kube_apis, ingress_controller_prerequisites, crd_ingress_controller_with_dos, dos_setup, test_namespace
+        self,
+        kube_apis,
+        ingress_controller_prerequisites,
+        crd_ingress_controller_with_dos,
+        dos_setup,
+        learned_state,
+        test_namespace,
     ):
         """
         Test App Protect Dos: Block bad clients attack with learning
         """
         log_loc = f"/var/log/messages"
-        print("----------------------- Get syslog pod name ----------------------")
-        syslog_pod = self.getPodNameThatContains(kube_apis, ingress_controller_prerequisites.namespace, "syslog")
-        assert "syslog" in syslog_pod
-        clear_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
-
-        print("------------------------- Deploy ingress -----------------------------")
-        create_ingress_with_dos_annotations(kube_apis, src_ing_yaml, test_namespace, test_namespace + "/dos-protected")
-        ingress_host = get_first_ingress_host_from_yaml(src_ing_yaml)
-
-        print("------------------------- Learning Phase -----------------------------")
-        print("start good clients requests")
-        p_good_client = subprocess.Popen(
-            [f"exec {TEST_DATA}/dos/good_clients_xff.sh {ingress_host} {dos_setup.req_url}"],
-            preexec_fn=os.setsid,
-            shell=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-
-        print("Learning for max 15 minutes")
-        nginx_ingress_pod_name = self.getPodNameThatContains(
-            kube_apis, ingress_controller_prerequisites.namespace, "nginx"
-        )
-        check_learning_status_with_admd_s(
-            kube_apis,
-            nginx_ingress_pod_name,
-            ingress_controller_prerequisites.namespace,
-            900,
-        )
+        syslog_pod = learned_state.syslog_pod
+        ingress_host = learned_state.ingress_host
 
         print("------------------------- Attack -----------------------------")
         print("start bad clients requests")
         p_attack = subprocess.Popen(
-            [f"exec {TEST_DATA}/dos/bad_clients_xff.sh {ingress_host} {dos_setup.req_url}"],
-            preexec_fn=os.setsid,
-            shell=True,
+            [f"{TEST_DATA}/dos/bad_clients_xff.sh", ingress_host, dos_setup.req_url],
+            start_new_session=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
 
         print("Wait max 5 Min until finding 3 bad clients")
-        find_in_log(
-            kube_apis,
-            log_loc,
+        log_contents = learned_state.log_contents
+        log_contents += wait_for_log_pattern(
+            kube_apis.v1,
             syslog_pod,
             ingress_controller_prerequisites.namespace,
-            300,
+            log_loc,
             'bad_actors="3"',
+            300,
+            offset=len(log_contents.encode()),
         )
 
         print("Stop Attack")
-        p_attack.terminate()
+        stop_clients(p_attack)
 
         print("wait max 200 seconds after attack stop, to get attack ended")
-        find_in_log(
-            kube_apis,
-            log_loc,
+        log_contents += wait_for_log_pattern(
+            kube_apis.v1,
             syslog_pod,
             ingress_controller_prerequisites.namespace,
-            200,
+            log_loc,
             'attack_event="Attack ended"',
+            200,
+            offset=len(log_contents.encode()),
         )
 
-        print("Stop Good Client")
-        p_good_client.terminate()
-
-        log_contents = get_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
-        log_info_dic = log_content_to_dic(log_contents)
+        new_contents, _ = get_file_contents_since(
+            kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace, len(log_contents.encode())
+        )
+        log_contents += new_contents
+        logs = log_content_to_dic(log_contents)
 
         # Analyze the log
-        no_attack = False
-        attack_started = False
-        under_attack = False
-        attack_ended = False
-        bad_actor_detected = False
-        signature_detected = False
-        health_ok = False
-        bad_ip = ["1.1.1.1", "1.1.1.2", "1.1.1.3"]
-        fmt = "%b %d %Y %H:%M:%S"
-        for log in log_info_dic:
-            if log["attack_event"] == "No Attack":
-                if int(log["dos_attack_id"]) == 0 and not no_attack:
-                    no_attack = True
-            elif log["attack_event"] == "Attack started":
-                if int(log["dos_attack_id"]) > 0 and not attack_started:
-                    attack_started = True
-                    start_attack_time = datetime.strptime(log["date_time"], fmt)
-            elif log["attack_event"] == "Under Attack":
-                under_attack = True
-                if not health_ok and float(log["stress_level"]) < 0.6:
-                    health_ok = True
-                    health_ok_time = datetime.strptime(log["date_time"], fmt)
-                if not signature_detected and int(log["mitigated_by_signatures"]) > 0:
-                    signature_detected = True
-            elif log["attack_event"] == "Bad actors detected":
-                if under_attack:
-                    bad_actor_detected = True
-            elif log["attack_event"] == "Bad actor detection":
-                if under_attack and log["source_ip"] in bad_ip:
-                    bad_ip.remove(log["source_ip"])
-            elif log["attack_event"] == "Attack ended":
-                attack_ended = True
-
-        delete_items_from_yaml(kube_apis, src_ing_yaml, test_namespace)
+        event = logs["attack_event"]
+        position = np.arange(len(event))
+        under_attack_mask = event == "Under Attack"
+        attack_started_mask = (event == "Attack started") & (logs["dos_attack_id"] > 0)
+        health_ok_mask = under_attack_mask & (logs["stress_level"] < 0.6)
+        after_under_attack = position > position[under_attack_mask].min(initial=len(event))
+
+        no_attack = ((event == "No Attack") & (logs["dos_attack_id"] == 0)).any()
+        attack_started = attack_started_mask.any()
+        under_attack = under_attack_mask.any()
+        attack_ended = (event == "Attack ended").any()
+        health_ok = health_ok_mask.any()
+        signature_detected = (under_attack_mask & (logs["mitigated_by_signatures"] > 0)).any()
+        bad_actor_detected = ((event == "Bad actors detected") & after_under_attack).any()
+        bad_ip = {"1.1.1.1", "1.1.1.2", "1.1.1.3"} - set(
+            logs["source_ip"][(event == "Bad actor detection") & after_under_attack]
+        )
+        if health_ok and attack_started:
+            recovery_time = logs["date_time"][health_ok_mask][0] - logs["date_time"][attack_started_mask][0]
 
         assert (
             no_attack
@@ -422,47 +581,27 @@ class TestDos:
             and under_attack
             and attack_ended
             and health_ok
-            and (health_ok_time - start_attack_time).total_seconds() < 150
+            and recovery_time < np.timedelta64(150, "s")
             and signature_detected
             and bad_actor_detected
             and len(bad_ip) <= 1
         )
 
     def test_dos_arbitrator(
-        self, kube_apis, ingress_controller_prerequisites, crd_ingress_controller_with_dos, dos_setup, test_namespace
+        self,
+        kube_apis,
+        ingress_controller_prerequisites,
+        crd_ingress_controller_with_dos,
+        dos_setup,
+        learned_state,
+        test_namespace,
     ):
         """
         Test App Protect Dos: Check new IC pod get learning info
         """
-        print("----------------------- Get syslog pod name ----------------------")
-        syslog_pod = self.getPodNameThatContains(kube_apis, ingress_controller_prerequisites.namespace, "syslog")
-        assert "syslog" in syslog_pod
         log_loc = f"/var/log/messages"
-        clear_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
-
-        print("------------------------- Deploy ingress -----------------------------")
-        create_ingress_with_dos_annotations(kube_apis, src_ing_yaml, test_namespace, test_namespace + "/dos-protected")
-        ingress_host = get_first_ingress_host_from_yaml(src_ing_yaml)
-
-        print("------------------------- Learning Phase -----------------------------")
-        print("start good clients requests")
-        p_good_client = subprocess.Popen(
-            [f"exec {TEST_DATA}/dos/good_clients_xff.sh {ingress_host} {dos_setup.req_url}"],
-            preexec_fn=os.setsid,
-            shell=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-
-        print("Learning for max 15 minutes")
-        find_in_log(
-            kube_apis,
-            log_loc,
-            syslog_pod,
-            ingress_controller_prerequisites.namespace,
-            900,
-            'learning_confidence="Ready"',
-        )
+        syslog_pod = learned_state.syslog_pod
+        log_contents = learned_state.log_contents
 
         print("------------------------- Check new IC pod get info from arbitrator -----------------------------")
         ic_ns = ingress_controller_prerequisites.namespace
@@ -472,85 +611,84 @@ class TestDos:
             wait_before_test()
 
         print("------------------------- Check if new pod receive info from arbitrator -----------------------------")
-        print("Wait for 60 seconds")
-        wait_before_test(60)
-
-        log_contents = get_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
-        log_info_dic = log_content_to_dic(log_contents)
+        print("Wait for both IC pods to report learning ready, max 90 seconds")
+        logs = log_content_to_dic(log_contents)
+        _, learning_units_hostname = wait_for_ready_units(
+            kube_apis.v1,
+            syslog_pod,
+            ingress_controller_prerequisites.namespace,
+            log_loc,
+            2,
+            90,
+            offset=len(log_contents.encode()),
+            known_units=logs["unit_hostname"][logs["learning_confidence"] == "Ready"],
+        )
 
-        print("Stop Good Client")
-        p_good_client.terminate()
+        assert len(learning_units_hostname) == 2
 
-        learning_units_hostname = []
-        for log in log_info_dic:
-            if log["unit_hostname"] not in learning_units_hostname and log["learning_confidence"] == "Ready":
-                learning_units_hostname.append(log["unit_hostname"])
 
-        delete_items_from_yaml(kube_apis, src_ing_yaml, test_namespace)
+@pytest.mark.dos
+@pytest.mark.dos_ingress
+@pytest.mark.xdist_group(name="dos")
+@pytest.mark.parametrize(
+    "crd_ingress_controller_with_dos",
+    [
+        {
+            "extra_args": [
+                f"-enable-custom-resources",
+                f"-enable-app-protect-dos",
+                f"-log-level=debug",
+                f"-app-protect-dos-debug",
+            ]
+        }
+    ],
+    indirect=["crd_ingress_controller_with_dos"],
+)
+class TestDosArbitratorDifferentNs:
+    """
+    Runs its own learning phase: the dos arbitrator is moved to another namespace before learning starts.
 
-        assert len(learning_units_hostname) == 2
+    It replaces the arbitrator and the ConfigMap in the IC namespace, so it is in the same xdist group as TestDos
+    and runs after TestDos is torn down.
+    """
 
     def test_dos_arbitrator_different_ns(
-        self, kube_apis, ingress_controller_prerequisites, crd_ingress_controller_with_dos, dos_setup, test_namespace
+        self,
+        kube_apis,
+        ingress_controller_prerequisites,
+        crd_ingress_controller_with_dos,
+        dos_setup,
+        dos_pods,
+        dos_ingress,
+        arbitrator_different_ns,
     ):
         """
         Test App Protect Dos: Check new IC pod get learning info with arbitrator from different namespace
         """
 
-        print("Remove dos arbitrator from namespace: ", ingress_controller_prerequisites.namespace)
-        delete_dos_arbitrator(
-            kube_apis.v1, kube_apis.apps_v1_api, "appprotect-dos-arb", ingress_controller_prerequisites.namespace
-        )
-
-        print("------------------------- Create dos arbitrator Namespace -----------------------")
-        arbitrator_ns_yaml = f"{TEST_DATA}/dos/arbitrator_ns.yaml"
-        res = create_items_from_yaml(kube_apis, arbitrator_ns_yaml, "")
-
-        print("------------------------- Create dos arbitrator in arbitrator namespace -----------------------")
-        create_dos_arbitrator(
-            kube_apis.v1,
-            kube_apis.apps_v1_api,
-            res["Namespace"],
-            f"{TEST_DATA}/dos/appprotect-dos-arb.yaml",
-            f"{TEST_DATA}/dos/appprotect-dos-arb-svc.yaml",
-        )
-
-        print(f"------------- Replace ConfigMap --------------")
-        replace_configmap_from_yaml(
-            kube_apis.v1,
-            ingress_controller_prerequisites.config_map["metadata"]["name"],
-            ingress_controller_prerequisites.namespace,
-            f"{TEST_DATA}/dos/nginx-config-arb-dif-ns.yaml",
-        )
-
         print("----------------------- Get syslog pod name ----------------------")
-        syslog_pod = self.getPodNameThatContains(kube_apis, ingress_controller_prerequisites.namespace, "syslog")
+        syslog_pod = dos_pods["syslog"]
         assert "syslog" in syslog_pod
         log_loc = f"/var/log/messages"
         clear_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
 
-        print("------------------------- Deploy ingress -----------------------------")
-        create_ingress_with_dos_annotations(kube_apis, src_ing_yaml, test_namespace, test_namespace + "/dos-protected")
-        ingress_host = get_first_ingress_host_from_yaml(src_ing_yaml)
-
         # print("------------------------- Learning Phase -----------------------------")
         print("start good clients requests")
         p_good_client = subprocess.Popen(
-            [f"exec {TEST_DATA}/dos/good_clients_xff.sh {ingress_host} {dos_setup.req_url}"],
-            preexec_fn=os.setsid,
-            shell=True,
+            [f"{TEST_DATA}/dos/good_clients_xff.sh", dos_ingress, dos_setup.req_url],
+            start_new_session=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
 
         print("Learning for max 15 minutes")
-        find_in_log(
-            kube_apis,
-            log_loc,
+        log_contents = wait_for_log_pattern(
+            kube_apis.v1,
             syslog_pod,
             ingress_controller_prerequisites.namespace,
-            900,
+            log_loc,
             'learning_confidence="Ready"',
+            900,
         )
 
         print("------------------------- Check new IC pod get info from arbitrator -----------------------------")
@@ -561,40 +699,20 @@ class TestDos:
             wait_before_test()
 
         print("------------------------- Check if new pod receive info from arbitrator -----------------------------")
-        print("Wait for 60 seconds")
-        wait_before_test(60)
-
-        log_contents = get_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
-        log_info_dic = log_content_to_dic(log_contents)
-
-        print("Stop Good Client")
-        p_good_client.terminate()
-
-        learning_units_hostname = []
-        for log in log_info_dic:
-            if log["unit_hostname"] not in learning_units_hostname and log["learning_confidence"] == "Ready":
-                learning_units_hostname.append(log["unit_hostname"])
-
-        delete_items_from_yaml(kube_apis, src_ing_yaml, test_namespace)
-
-        print("Delete namespace: arbitrator")
-        delete_items_from_yaml(kube_apis, arbitrator_ns_yaml, "")
-
-        print("------------------------- Restore dos arbitrator in nginx namespace -----------------------")
-        create_dos_arbitrator(
+        print("Wait for both IC pods to report learning ready, max 90 seconds")
+        logs = log_content_to_dic(log_contents)
+        _, learning_units_hostname = wait_for_ready_units(
             kube_apis.v1,
-            kube_apis.apps_v1_api,
+            syslog_pod,
             ingress_controller_prerequisites.namespace,
-            f"{TEST_DATA}/dos/appprotect-dos-arb.yaml",
-            f"{TEST_DATA}/dos/appprotect-dos-arb-svc.yaml",
+            log_loc,
+            2,
+            90,
+            offset=len(log_contents.encode()),
+            known_units=logs["unit_hostname"][logs["learning_confidence"] == "Ready"],
         )
 
-        print(f"------------- Restore ConfigMap --------------")
-        replace_configmap_from_yaml(
-            kube_apis.v1,
-            ingress_controller_prerequisites.config_map["metadata"]["name"],
-            ingress_controller_prerequisites.namespace,
-            f"{TEST_DATA}/dos/nginx-config.yaml",
-        )
+        print("Stop Good Client")
+        stop_clients(p_good_client)
 
         assert len(learning_units_hostname) == 2
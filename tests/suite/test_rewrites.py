@@ -10,7 +10,7 @@ from suite.utils.resources_utils import (
 from suite.utils.vs_vsr_resources_utils import (
     create_v_s_route_from_yaml,
     create_virtual_server_from_yaml,
-    delete_v_s_route,
+    delete_v_s_routes,
     delete_virtual_server,
 )
 
@@ -72,9 +72,7 @@ def vsr_rewrites_setup(
     def fin():
         if request.config.getoption("--skip-fixture-teardown") == "no":
             delete_virtual_server(kube_apis.custom_objects, vs_parent, test_namespace)
-            delete_v_s_route(kube_apis.custom_objects, vsr_prefixes, test_namespace)
-            delete_v_s_route(kube_apis.custom_objects, vsr_regex1, test_namespace)
-            delete_v_s_route(kube_apis.custom_objects, vsr_regex2, test_namespace)
+            delete_v_s_routes(kube_apis.custom_objects, [vsr_prefixes, vsr_regex1, vsr_regex2], test_namespace)
 
     request.addfinalizer(fin)
 
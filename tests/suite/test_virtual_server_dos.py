@@ -1,7 +1,6 @@
-import os
 import subprocess
-from datetime import datetime
 
+import numpy as np
 import pytest
 import requests
 from settings import TEST_DATA
@@ -19,6 +18,7 @@ from suite.utils.dos_utils import (
     clean_good_bad_clients,
     find_in_log,
     log_content_to_dic,
+    stop_clients,
 )
 from suite.utils.resources_utils import (
     clear_file_contents,
@@ -154,6 +154,8 @@ def dos_setup(
 
 
 @pytest.mark.dos
+# shares the IC namespace and its DOS resources with suite/test_dos.py
+@pytest.mark.xdist_group(name="dos")
 @pytest.mark.parametrize(
     "crd_ingress_controller_with_dos, virtual_server_setup_dos",
     [
@@ -310,8 +312,8 @@ class TestDos:
         print("------------------------- Attack -----------------------------")
         print("start bad clients requests")
         p_attack = subprocess.Popen(
-            [f"exec {TEST_DATA}/dos/bad_clients_xff.sh {virtual_server_setup_dos.vs_host} {dos_setup.req_url}"],
-            shell=True,
+            [f"{TEST_DATA}/dos/bad_clients_xff.sh", virtual_server_setup_dos.vs_host, dos_setup.req_url],
+            start_new_session=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
@@ -320,7 +322,7 @@ class TestDos:
         wait_before_test(30)
 
         print("Stop Attack")
-        p_attack.terminate()
+        stop_clients(p_attack)
 
         print("wait max 200 seconds after attack stop, to get attack ended")
         find_in_log(
@@ -333,26 +335,15 @@ class TestDos:
         )
 
         log_contents = get_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
-        log_info_dic = log_content_to_dic(log_contents)
+        logs = log_content_to_dic(log_contents)
 
         # Analyze the log
-        no_attack = False
-        attack_started = False
-        under_attack = False
-        attack_ended = False
-        for log in log_info_dic:
-            # Start with no attack
-            if log["attack_event"] == "No Attack" and int(log["dos_attack_id"]) == 0 and not no_attack:
-                no_attack = True
-            # Attack started
-            elif log["attack_event"] == "Attack started" and int(log["dos_attack_id"]) > 0 and not attack_started:
-                attack_started = True
-            # Under attack
-            elif log["attack_event"] == "Under Attack" and int(log["dos_attack_id"]) > 0 and not under_attack:
-                under_attack = True
-            # Attack ended
-            elif log["attack_event"] == "Attack ended" and int(log["dos_attack_id"]) > 0 and not attack_ended:
-                attack_ended = True
+        event = logs["attack_event"]
+        attack_id = logs["dos_attack_id"]
+        no_attack = ((event == "No Attack") & (attack_id == 0)).any()
+        attack_started = ((event == "Attack started") & (attack_id > 0)).any()
+        under_attack = ((event == "Under Attack") & (attack_id > 0)).any()
+        attack_ended = ((event == "Attack ended") & (attack_id > 0)).any()
 
         assert no_attack and attack_started and under_attack and attack_ended
 
@@ -378,9 +369,8 @@ class TestDos:
         print("------------------------- Learning Phase -----------------------------")
         print("start good clients requests")
         p_good_client = subprocess.Popen(
-            [f"exec {TEST_DATA}/dos/good_clients_xff.sh {virtual_server_setup_dos.vs_host} {dos_setup.req_url}"],
-            preexec_fn=os.setsid,
-            shell=True,
+            [f"{TEST_DATA}/dos/good_clients_xff.sh", virtual_server_setup_dos.vs_host, dos_setup.req_url],
+            start_new_session=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
@@ -399,9 +389,8 @@ class TestDos:
         print("------------------------- Attack -----------------------------")
         print("start bad clients requests")
         p_attack = subprocess.Popen(
-            [f"exec {TEST_DATA}/dos/bad_clients_xff.sh {virtual_server_setup_dos.vs_host} {dos_setup.req_url}"],
-            preexec_fn=os.setsid,
-            shell=True,
+            [f"{TEST_DATA}/dos/bad_clients_xff.sh", virtual_server_setup_dos.vs_host, dos_setup.req_url],
+            start_new_session=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
@@ -417,7 +406,7 @@ class TestDos:
         )
 
         print("Stop Attack")
-        p_attack.terminate()
+        stop_clients(p_attack)
 
         print("wait max 200 seconds after attack stop, to get attack ended")
         find_in_log(
@@ -430,44 +419,32 @@ class TestDos:
         )
 
         print("Stop Good Client")
-        p_good_client.terminate()
+        stop_clients(p_good_client)
 
         log_contents = get_file_contents(kube_apis.v1, log_loc, syslog_pod, ingress_controller_prerequisites.namespace)
-        log_info_dic = log_content_to_dic(log_contents)
+        logs = log_content_to_dic(log_contents)
 
         # Analyze the log
-        no_attack = False
-        attack_started = False
-        under_attack = False
-        attack_ended = False
-        bad_actor_detected = False
-        signature_detected = False
-        health_ok = False
-        bad_ip = ["1.1.1.1", "1.1.1.2", "1.1.1.3"]
-        fmt = "%b %d %Y %H:%M:%S"
-        for log in log_info_dic:
-            if log["attack_event"] == "No Attack":
-                if int(log["dos_attack_id"]) == 0 and not no_attack:
-                    no_attack = True
-            elif log["attack_event"] == "Attack started":
-                if int(log["dos_attack_id"]) > 0 and not attack_started:
-                    attack_started = True
-                    start_attack_time = datetime.strptime(log["date_time"], fmt)
-            elif log["attack_event"] == "Under Attack":
-                under_attack = True
-                if not health_ok and float(log["stress_level"]) < 0.6:
-                    health_ok = True
-                    health_ok_time = datetime.strptime(log["date_time"], fmt)
-                    if not signature_detected and int(log["mitigated_by_signatures"]) > 0:
-                        signature_detected = True
-            elif log["attack_event"] == "Bad actors detected":
-                if under_attack:
-                    bad_actor_detected = True
-            elif log["attack_event"] == "Bad actor detection":
-                if under_attack and log["source_ip"] in bad_ip:
-                    bad_ip.remove(log["source_ip"])
-            elif log["attack_event"] == "Attack ended":
-                attack_ended = True
+        event = logs["attack_event"]
+        position = np.arange(len(event))
+        under_attack_mask = event == "Under Attack"
+        attack_started_mask = (event == "Attack started") & (logs["dos_attack_id"] > 0)
+        health_ok_mask = under_attack_mask & (logs["stress_level"] < 0.6)
+        after_under_attack = position > position[under_attack_mask].min(initial=len(event))
+
+        no_attack = ((event == "No Attack") & (logs["dos_attack_id"] == 0)).any()
+        attack_started = attack_started_mask.any()
+        under_attack = under_attack_mask.any()
+        attack_ended = (event == "Attack ended").any()
+        health_ok = health_ok_mask.any()
+        # signatures are checked on the first row where health got back to normal
+        signature_detected = health_ok and logs["mitigated_by_signatures"][health_ok_mask][0] > 0
+        bad_actor_detected = ((event == "Bad actors detected") & after_under_attack).any()
+        bad_ip = {"1.1.1.1", "1.1.1.2", "1.1.1.3"} - set(
+            logs["source_ip"][(event == "Bad actor detection") & after_under_attack]
+        )
+        if health_ok and attack_started:
+            recovery_time = logs["date_time"][health_ok_mask][0] - logs["date_time"][attack_started_mask][0]
 
         assert (
             no_attack
@@ -475,7 +452,7 @@ class TestDos:
             and under_attack
             and attack_ended
             and health_ok
-            and (health_ok_time - start_attack_time).total_seconds() < 150
+            and recovery_time < np.timedelta64(150, "s")
             and signature_detected
             and bad_actor_detected
             and len(bad_ip) <= 1
@@ -1,39 +1,204 @@
+import functools
 import os
+import re
+import signal
 import subprocess
+import time
 
+import numpy as np
 from kubernetes.client import CoreV1Api
 from kubernetes.stream import stream
-from suite.utils.resources_utils import get_file_contents, wait_before_test
+from suite.utils.resources_utils import wait_before_test
 
+_MONTHS = {
+    "Jan": "01",
+    "Feb": "02",
+    "Mar": "03",
+    "Apr": "04",
+    "May": "05",
+    "Jun": "06",
+    "Jul": "07",
+    "Aug": "08",
+    "Sep": "09",
+    "Oct": "10",
+    "Nov": "11",
+    "Dec": "12",
+}
+_DOS_LOG_LINE = re.compile(r"^[^\r\n]*app-protect-dos[^\r\n]*", re.MULTILINE)
+_READY_UNIT = re.compile(r'unit_hostname="?([^",]*)')
+_READY_CONFIDENCE = re.compile(r'learning_confidence="?Ready\b')
+# key=value or key="value" fields of a log line, a value ends at the next comma like in the log format
+_DOS_LOG_FIELD = re.compile(r'(\w+)="?([^",\r\n]*)"?(?=,|$)', re.MULTILINE)
 
-def log_content_to_dic(log_contents):
-    arr = []
-    for line in log_contents.splitlines():
-        if line.__contains__("app-protect-dos"):
-            arr.append(line)
 
-    log_info_dic = []
-    for line in arr:
-        chunks = line.split(",")
-        d = {}
-        for chunk in chunks:
-            tmp = chunk.split("=")
-            if len(tmp) == 2:
-                if "date_time" in tmp[0]:
-                    tmp[0] = "date_time"
-                d[tmp[0].strip()] = tmp[1].replace('"', "")
-        log_info_dic.append(d)
-    return log_info_dic
+def _date_time_to_iso(value) -> str:
+    """
+    Convert a "%b %d %Y %H:%M:%S" log date, e.g. "Mar 05 2025 10:11:12", to ISO 8601 without strptime.
 
+    :param value: str
+    :return: str e.g. "2025-03-05T10:11:12", or "NaT" for an empty or malformed value
+    """
+    if not value:
+        return "NaT"
+    try:
+        month, day, year, clock = value.split()
+        iso = f"{year}-{_MONTHS[month]}-{int(day):02d}T{clock}"
+        # a bad year or clock only fails here, not in the column of all the dates
+        np.datetime64(iso, "s")
+    except (KeyError, ValueError):
+        return "NaT"
+    return iso
 
-def find_in_log(kube_apis, log_location, syslog_pod, namespace, time, value):
+
+@functools.lru_cache(maxsize=32)
+def _compile_keys(keys) -> re.Pattern:
+    # the lookahead matches at every position, so overlapping keys are all found
+    alternation = "|".join(re.escape(key) for key in sorted(keys, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))")
+
+
+def find_any(contents, keys) -> set:
+    """
+    Find which of the keys occur in a log or config, scanning it once.
+
+    :param contents: str the log or config contents
+    :param keys: iterable of substrings to look for
+    :return: set of the keys found in the contents
+    """
+    keys = tuple(keys)
+    found = {m.group(1) for m in _compile_keys(keys).finditer(contents)}
+    # a key that is a prefix of a longer key found at the same position is shadowed by it
+    return found | {key for key in keys if any(key in match for match in found)}
+
+
+def log_content_to_dic(log_contents) -> dict:
+    """
+    Parse the app-protect-dos lines of a security log into columns, one numpy array per field.
+
+    Fields missing from a line are filled with "", 0, nan or NaT depending on the column type.
+
+    :param log_contents: str the log contents
+    :return: dict field name -> np.ndarray, all arrays of the same length
+    """
+    rows = [dict(_DOS_LOG_FIELD.findall(line)) for line in _DOS_LOG_LINE.findall(log_contents)]
+
+    return {
+        "attack_event": np.array([row.get("attack_event", "") for row in rows], dtype=str),
+        "dos_attack_id": np.array([int(row.get("dos_attack_id") or 0) for row in rows], dtype=np.int64),
+        "stress_level": np.array([float(row.get("stress_level") or "nan") for row in rows], dtype=np.float32),
+        "date_time": np.array([_date_time_to_iso(row.get("date_time")) for row in rows], dtype="datetime64[s]"),
+        "source_ip": np.array([row.get("source_ip", "") for row in rows], dtype=object),
+        "mitigated_by_signatures": np.array(
+            [int(row.get("mitigated_by_signatures") or 0) for row in rows], dtype=np.int64
+        ),
+        "unit_hostname": np.array([row.get("unit_hostname", "") for row in rows], dtype=object),
+        "learning_confidence": np.array([row.get("learning_confidence", "") for row in rows], dtype=str),
+    }
+
+
+def _follow_log(v1: CoreV1Api, pod_name, pod_namespace, log_location, timeout, offset, done) -> (str, bool):
+    """
+    Follow a log file in a pod with 'tail -F' until done returns True for the contents read so far.
+
+    :param done: callable(log_contents, start) -> bool, start is the index where the new chunk's search window begins
+    :return: (str, bool) the log contents read after offset and whether done was reached before the timeout
+    """
+    resp = stream(
+        v1.connect_get_namespaced_pod_exec,
+        pod_name,
+        pod_namespace,
+        command=["tail", "-F", "-c", f"+{offset + 1}", log_location],
+        stderr=True,
+        stdin=False,
+        stdout=True,
+        tty=False,
+        _preload_content=False,
+    )
     log_contents = ""
-    retry = 0
-    while value not in log_contents and retry <= time / 10:
-        log_contents = get_file_contents(kube_apis.v1, log_location, syslog_pod, namespace, False)
-        retry += 1
-        wait_before_test(10)
-        print(f"{value} Not in log, retrying... #{retry}")
+    found = False
+    deadline = time.monotonic() + timeout
+    try:
+        while not found and resp.is_open() and time.monotonic() < deadline:
+            chunk = resp.read_stdout(timeout=1)
+            if chunk:
+                start = len(log_contents)
+                log_contents += chunk
+                found = done(log_contents, start)
+    finally:
+        resp.close()
+    return log_contents, found
+
+
+def wait_for_log_pattern(v1: CoreV1Api, pod_name, pod_namespace, log_location, pattern, timeout, offset=0) -> str:
+    """
+    Follow a log file in a pod with 'tail -F' and return as soon as the pattern appears in it.
+
+    Pass the number of bytes already read as offset to follow the log from there instead of from its start.
+
+    :param v1: CoreV1Api
+    :param pod_name: pod name
+    :param pod_namespace: pod namespace
+    :param log_location: an absolute path to the log file in the pod
+    :param pattern: substring to wait for
+    :param timeout: max time to wait in seconds
+    :param offset: number of bytes of the log to skip
+    :return: str the log contents read after offset
+    """
+    # only the new chunk and the tail that may hold a split match need to be searched
+    log_contents, found = _follow_log(
+        v1,
+        pod_name,
+        pod_namespace,
+        log_location,
+        timeout,
+        offset,
+        lambda contents, start: pattern in contents[max(0, start - len(pattern)) :],
+    )
+    if not found:
+        print(f"{pattern} not in log after {timeout} seconds")
+    return log_contents
+
+
+def wait_for_ready_units(
+    v1: CoreV1Api, pod_name, pod_namespace, log_location, count, timeout, offset=0, known_units=()
+) -> (str, set):
+    """
+    Follow a log file in a pod until count distinct unit_hostname values have logged learning_confidence="Ready".
+
+    :param v1: CoreV1Api
+    :param pod_name: pod name
+    :param pod_namespace: pod namespace
+    :param log_location: an absolute path to the log file in the pod
+    :param count: number of distinct ready units to wait for
+    :param timeout: max time to wait in seconds
+    :param offset: number of bytes of the log to skip
+    :param known_units: unit hostnames already seen as ready before offset
+    :return: (str, set) the log contents read after offset and the ready unit hostnames
+    """
+    units = set(known_units)
+    parsed = 0
+
+    def done(contents, start):
+        nonlocal parsed
+        # only complete lines are parsed, a partial last line is picked up with the next chunk
+        end = contents.rfind("\n") + 1
+        for line in contents[parsed:end].splitlines():
+            unit = _READY_UNIT.search(line)
+            if unit and _READY_CONFIDENCE.search(line):
+                units.add(unit.group(1))
+        parsed = max(parsed, end)
+        return len(units) >= count
+
+    if len(units) >= count:
+        return "", units
+    log_contents, found = _follow_log(v1, pod_name, pod_namespace, log_location, timeout, offset, done)
+    if not found:
+        print(f"{len(units)} of {count} units are learning ready after {timeout} seconds")
+    return log_contents, units
+
+
+def find_in_log(kube_apis, log_location, syslog_pod, namespace, time, value):
+    return wait_for_log_pattern(kube_apis.v1, syslog_pod, namespace, log_location, value, time)
 
 
 def admd_s_content_to_dic(admd_s_contents):
@@ -84,6 +249,20 @@ def get_admd_s_contents(v1: CoreV1Api, pod_name, pod_namespace, time):
     return admd_contents
 
 
+def stop_clients(process: subprocess.Popen) -> None:
+    """
+    Stop a clients script started with start_new_session=True, together with the requests it spawned.
+
+    :param process: the script process, the leader of its own process group
+    """
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        # the script has already exited
+        pass
+    process.wait(timeout=10)
+
+
 def clean_good_bad_clients():
     command = "exec ps -aux | grep good_clients_xff.sh | awk '{print $2}' | xargs kill -9"
 
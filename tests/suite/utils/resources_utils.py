@@ -408,6 +408,21 @@ def get_pod_name_that_contains(v1: CoreV1Api, namespace, contains_string) -> str
     return ""
 
 
+def get_pod_name_with_label(v1: CoreV1Api, namespace, label_selector) -> str:
+    """
+    Get the name of the first pod matching a label selector.
+
+    The list is served from the apiserver watch cache (resource_version="0").
+
+    :param v1: CoreV1Api
+    :param namespace: namespace
+    :param label_selector: label selector, e.g. "app=nginx-ingress"
+    :return: string
+    """
+    pods = v1.list_namespaced_pod(namespace, label_selector=label_selector, limit=1, resource_version="0").items
+    return pods[0].metadata.name if pods else ""
+
+
 def create_service_from_yaml(v1: CoreV1Api, namespace, yaml_manifest) -> str:
     """
     Create a service based on yaml file.
@@ -964,6 +979,33 @@ def get_file_contents(v1: CoreV1Api, file_path, pod_name, pod_namespace, print_l
     return result_conf
 
 
+def get_file_contents_since(v1: CoreV1Api, file_path, pod_name, pod_namespace, offset) -> (str, int):
+    """
+    Execute 'tail -c +offset+1 file_path' command in a pod to read only what was appended after offset.
+
+    :param v1: CoreV1Api
+    :param file_path: an absolute path to a file in the pod
+    :param pod_name: pod name
+    :param pod_namespace: pod namespace
+    :param offset: number of bytes already read
+    :return: (str, int) the new contents and the offset to pass on the next call
+    """
+    command = ["tail", "-c", f"+{offset + 1}", file_path]
+    # str(resp) joins stdout and stderr, a tail error must not end up in the contents and the offset
+    resp = stream(
+        v1.connect_get_namespaced_pod_exec,
+        pod_name,
+        pod_namespace,
+        command=command,
+        stderr=False,
+        stdin=False,
+        stdout=True,
+        tty=False,
+    )
+    new_contents = str(resp)
+    return new_contents, offset + len(new_contents.encode())
+
+
 def nginx_reload(v1: CoreV1Api, pod_name, pod_namespace) -> str:
     """
     Execute 'nginx -s reload' command in a pod.
@@ -1826,6 +1868,29 @@ def ensure_response_from_backend(req_url, host, additional_headers=None, check40
         pytest.fail(f"Keep getting 502|504 from {req_url} after 60 seconds. Exiting...")
 
 
+def wait_until_200(req_url, host, timeout=10, expected_status=200) -> None:
+    """
+    Poll the url every 100ms until it answers with the expected status, fail the test after the timeout.
+
+    :param req_url: url to request
+    :param host:
+    :param timeout: max time to wait in seconds
+    :param expected_status: the status code to wait for
+    :return:
+    """
+    status = None
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status = requests.get(req_url, headers={"host": host}, timeout=1, verify=False).status_code
+            if status == expected_status:
+                return
+        except requests.exceptions.RequestException as ex:
+            status = ex
+        time.sleep(0.1)
+    pytest.fail(f"No {expected_status} response from {req_url} after {timeout} seconds, the last one was {status}")
+
+
 def get_service_endpoint(kube_apis, service_name, namespace) -> str:
     """
     Wait for endpoint resource to spin up.
@@ -1960,6 +2025,19 @@ def write_to_json(fname, data) -> None:
         json.dump(file, f, ensure_ascii=False, indent=4)
 
 
+def append_to_jsonl(fname, record) -> None:
+    """
+    Append one record as a line to a JSON Lines file, so that each writer can stream its own file.
+
+    :param fname: filename.jsonl
+    :param record: dictionary
+    """
+    file_path = f"{PROJECT_ROOT}/json_files"
+    os.makedirs(file_path, exist_ok=True)
+    with open(f"{file_path}/{fname}", "a", buffering=1) as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
 def get_last_log_entry(kube_apis, pod_name, namespace) -> str:
     """
     :param kube_apis: kube apis
@@ -1,12 +1,421 @@
 """Describe methods to utilize the VS/VSR resources."""
 
+import contextlib
+import functools
+import hashlib
+import json
 import logging
-
+import os
+import pathlib
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import pytest
+import urllib3
 import yaml
-from kubernetes.client import CoreV1Api, CustomObjectsApi
-from kubernetes.client.rest import ApiException
+from kubernetes import watch
+from kubernetes.client import ApiClient, CoreV1Api, CustomObjectsApi
+from kubernetes.client.rest import ApiException, RESTClientObject, RESTResponse
+from settings import PROJECT_ROOT
 from suite.utils.custom_resources_utils import read_custom_resource
 from suite.utils.resources_utils import ensure_item_removal, get_file_contents, wait_before_test
+from urllib3.util.retry import Retry
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    # PyYAML built without LibYAML
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_VS_ARGS = ("k8s.nginx.org", "v1")
+_clients_by_api = weakref.WeakKeyDictionary()
+
+
+class _VSCustomClient:
+    """
+    The namespaced k8s.nginx.org/v1 custom object calls of one plural, sent through api_client.call_api directly.
+
+    This skips the kwargs checks and header selection CustomObjectsApi does on every call.
+    """
+
+    _JSON = "application/json"
+
+    def __init__(self, custom_objects: CustomObjectsApi, plural):
+        self._call_api = custom_objects.api_client.call_api
+        self._collection_path = f"/apis/{'/'.join(_VS_ARGS)}/namespaces/{{namespace}}/{plural}"
+        self._item_path = self._collection_path + "/{name}"
+
+    def _call(self, path, method, path_params, body=None, content_type=None) -> object:
+        # call_api adds the default headers to the dict it is given, so every call gets a new one
+        headers = {"Accept": self._JSON}
+        if content_type:
+            headers["Content-Type"] = content_type
+        return self._call_api(
+            path,
+            method,
+            path_params,
+            [],
+            headers,
+            body=body,
+            response_type="object",
+            auth_settings=["BearerToken"],
+            _return_http_data_only=True,
+            _preload_content=True,
+        )
+
+    def create(self, namespace, body) -> object:
+        return self._call(self._collection_path, "POST", {"namespace": namespace}, body)
+
+    def patch(self, namespace, name, body) -> object:
+        return self._call(
+            self._item_path, "PATCH", {"namespace": namespace, "name": name}, body, "application/merge-patch+json"
+        )
+
+    def delete(self, namespace, name) -> object:
+        return self._call(self._item_path, "DELETE", {"namespace": namespace, "name": name})
+
+
+def _vs_client(custom_objects: CustomObjectsApi, plural) -> _VSCustomClient:
+    """
+    Get the cached _VSCustomClient of a client for a plural.
+
+    :param custom_objects: CustomObjectsApi
+    :param plural: virtualservers or virtualserverroutes
+    :return: _VSCustomClient
+    """
+    clients = _clients_by_api.setdefault(custom_objects, {})
+    client = clients.get(plural)
+    if client is None:
+        client = clients[plural] = _VSCustomClient(custom_objects, plural)
+    return client
+
+
+def configure_client(api_client: ApiClient) -> ApiClient:
+    """
+    Let an api client keep more connections to the API server open and retry throttled or failed requests.
+
+    :param api_client: ApiClient
+    :return: ApiClient the same client
+    """
+    api_client.configuration.connection_pool_maxsize = 50
+    # with raise_on_status urllib3 raises MaxRetryError for the last failed status instead of returning it,
+    # the response is needed for the client to raise ApiException as for any other failed request
+    api_client.configuration.retries = Retry(
+        total=3, backoff_factor=0.1, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False
+    )
+    # the connection pool is built from the configuration when the client is created
+    api_client.rest_client = RESTClientObject(api_client.configuration)
+    return api_client
+
+
+class _FastJSONRESTClient(RESTClientObject):
+    """
+    A RESTClientObject that encodes JSON request bodies with orjson instead of json.dumps.
+    """
+
+    _JSON_TYPES = ("application/json", "application/merge-patch+json")
+
+    def request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        body=None,
+        post_params=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        headers = headers or {}
+        content_type = headers.setdefault("Content-Type", "application/json")
+        fallback = functools.partial(
+            super().request, method, url, query_params, headers, body, post_params, _preload_content, _request_timeout
+        )
+        if body is None or _request_timeout is not None or content_type not in self._JSON_TYPES:
+            return fallback()
+        try:
+            data = orjson.dumps(body)
+        except TypeError:
+            # a body orjson can't encode, e.g. with non-str keys
+            return fallback()
+        if query_params:
+            url += "?" + urlencode(query_params)
+        try:
+            r = self.pool_manager.request(method, url, body=data, preload_content=_preload_content, headers=headers)
+        except urllib3.exceptions.SSLError as e:
+            raise ApiException(status=0, reason=f"{type(e).__name__}\n{e}")
+        if _preload_content:
+            r = RESTResponse(r)
+            r.data = r.data.decode("utf8")
+        if not 200 <= r.status <= 299:
+            raise ApiException(http_resp=r)
+        return r
+
+
+def install_fast_json(api_client: ApiClient) -> ApiClient:
+    """
+    Let an api client encode JSON request bodies with orjson, a no-op when orjson is not installed.
+
+    Call it after configure_client, the new rest client is built from the configuration.
+
+    :param api_client: ApiClient
+    :return: ApiClient the same client
+    """
+    if orjson is not None:
+        api_client.rest_client = _FastJSONRESTClient(api_client.configuration)
+    return api_client
+
+
+def _retry(api_exceptions=(ApiException,), statuses=(429, 500, 502, 503, 504), attempts=4, base=0.1):
+    """
+    Retry a call that raised one of api_exceptions with one of statuses, sleeping base * 2**i before attempt i + 1.
+
+    The client's own urllib3 retries do not cover POST and PATCH, so the create and patch helpers are retried here.
+    A create is retried on 429 only: after a 5xx it may have succeeded, and the retry would fail with 409.
+    The failure is logged once, when it is raised.
+
+    :param api_exceptions: exception types to retry, they must have a status attribute
+    :param statuses: HTTP statuses to retry
+    :param attempts: max number of calls
+    :param base: first delay in seconds
+    :return: decorator
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for i in range(attempts):
+                try:
+                    return func(*args, **kwargs)
+                except api_exceptions as ex:
+                    if ex.status not in statuses or i == attempts - 1:
+                        logging.exception(f"Failed with exception while calling {func.__name__}: {ex}")
+                        raise
+                    delay = base * 2**i
+                    print(f"{func.__name__} got {ex.status}, retrying in {delay}s")
+                    time.sleep(delay)
+
+        return wrapper
+
+    return decorator
+
+
+_MANIFEST_CACHE_DIR = f"{PROJECT_ROOT}/.pytest_cache/manifests"
+
+
+def _load_manifest(path) -> dict:
+    """
+    Load a single document yaml manifest from its json copy in the cache dir, creating the copy when it is missing.
+
+    The copy is named after a hash of the yaml, so an edited manifest never reads the copy of an older version.
+
+    :param path: an absolute path to a file
+    :return: dict
+    """
+    data = pathlib.Path(path).read_bytes()
+    cache_path = f"{_MANIFEST_CACHE_DIR}/{hashlib.blake2b(data, digest_size=16).hexdigest()}.json"
+    try:
+        return json.loads(pathlib.Path(cache_path).read_bytes())
+    except (OSError, ValueError):
+        # no copy yet, or a broken one
+        pass
+    # the whole buffer at once lets LibYAML decode UTF-8 itself instead of reading the file in chunks
+    doc = yaml.load(data, Loader=_SafeLoader)
+    try:
+        dumped = json.dumps(doc)
+    except (TypeError, ValueError):
+        # a value that is not JSON serializable, like a yaml timestamp
+        return doc
+    if json.loads(dumped) != doc:
+        # json would turn non-str keys into strings, so such a manifest is always parsed from yaml
+        return doc
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}"
+    try:
+        os.makedirs(_MANIFEST_CACHE_DIR, exist_ok=True)
+        pathlib.Path(tmp_path).write_text(dumped)
+        # concurrent workers may write the same copy, a rename never leaves it half written
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # read-only checkout
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+    return doc
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_yaml(path, mtime_ns, size) -> (dict, str):
+    # mtime_ns and size are only part of the cache key, an edited file gets parsed again
+    doc = _load_manifest(path)
+    return doc, doc["metadata"]["name"]
+
+
+def _load_yaml_cached(path) -> (dict, str):
+    """
+    Load a single document yaml manifest, parsing each version of the file only once.
+
+    The returned dict is shared between callers and must not be modified.
+
+    :param path: an absolute path to a file
+    :return: (dict, str) the document and its metadata.name
+    """
+    st = os.stat(path)
+    return _parse_yaml(path, st.st_mtime_ns, st.st_size)
+
+
+def _wait_for_deletion_via_watch(custom_objects: CustomObjectsApi, group, version, namespace, plural, name, timeout):
+    """
+    Watch a custom resource until it is deleted.
+
+    :param custom_objects: CustomObjectsApi
+    :param group: API group
+    :param version: API version
+    :param namespace:
+    :param plural: resource plural
+    :param name: resource name
+    :param timeout: max time to wait in seconds
+    :return: bool True if the resource is gone, False on timeout
+    """
+    field_selector = f"metadata.name={name}"
+    items = custom_objects.list_namespaced_custom_object(
+        group, version, namespace, plural, field_selector=field_selector
+    )
+    if not items["items"]:
+        return True
+    w = watch.Watch()
+    try:
+        # start from the list's resourceVersion so that a deletion right after the list is not missed
+        for event in w.stream(
+            custom_objects.list_namespaced_custom_object,
+            group,
+            version,
+            namespace,
+            plural,
+            field_selector=field_selector,
+            resource_version=items["metadata"]["resourceVersion"],
+            timeout_seconds=timeout,
+        ):
+            if event["type"] == "DELETED":
+                return True
+    finally:
+        w.stop()
+    return False
+
+
+def _wait_for_removal(custom_objects: CustomObjectsApi, plural, name, namespace, timeout=120) -> None:
+    """
+    Wait for a k8s.nginx.org/v1 resource to be removed, polling if the watch cannot be used.
+
+    :param custom_objects: CustomObjectsApi
+    :param plural: resource plural
+    :param name: resource name
+    :param namespace:
+    :param timeout: max time to wait in seconds
+    :return:
+    """
+    try:
+        removed = _wait_for_deletion_via_watch(custom_objects, "k8s.nginx.org", "v1", namespace, plural, name, timeout)
+    except Exception as ex:
+        print(f"Failed to watch {plural} '{name}', polling instead: {ex}")
+        ensure_item_removal(custom_objects.get_namespaced_custom_object, "k8s.nginx.org", "v1", namespace, plural, name)
+        return
+    if not removed:
+        pytest.fail(f"Failed to remove the item after {timeout} seconds")
+
+
+def _wait_for_vs_status(
+    custom_objects: CustomObjectsApi,
+    namespace,
+    plural,
+    name,
+    expected_reason,
+    expected_state,
+    timeout=30,
+) -> dict:
+    """
+    Watch a VS/VSR until its status has the expected reason and state.
+
+    A resource keeps its status when it is updated, so use it right after a create: a new resource has no status yet
+    and the first matching status is the one of its spec.
+
+    :param custom_objects: CustomObjectsApi
+    :param namespace:
+    :param plural: virtualservers or virtualserverroutes
+    :param name:
+    :param expected_reason: e.g. AddedOrUpdated
+    :param expected_state: e.g. Valid
+    :param timeout: max time to wait in seconds
+    :return: dict the resource with the expected status, or as last seen on timeout
+    """
+    info = None
+    w = watch.Watch()
+    try:
+        # the first event is the resource as it is now, so an already reached status returns at once
+        for event in w.stream(
+            custom_objects.list_namespaced_custom_object,
+            "k8s.nginx.org",
+            "v1",
+            namespace,
+            plural,
+            field_selector=f"metadata.name={name}",
+            timeout_seconds=timeout,
+        ):
+            info = event["object"]
+            status = info.get("status") or {}
+            if status.get("reason") == expected_reason and status.get("state") == expected_state:
+                return info
+    finally:
+        w.stop()
+    print(f"{plural} '{name}' did not reach {expected_reason}/{expected_state} in {timeout} seconds")
+    return info if info is not None else read_custom_resource(custom_objects, namespace, plural, name)
+
+
+def _assert_status(info, reason, state) -> None:
+    """
+    Assert the status reason and state of a VS/VSR, building the failure message only when it fails.
+
+    :param info: the resource
+    :param reason: expected status.reason
+    :param state: expected status.state
+    :return:
+    """
+    status = info.get("status")
+    if not (status and status.get("reason") == reason and status.get("state") == state):
+        raise AssertionError(info)
+
+
+_VS_KIND = re.compile(rb"^kind:\s*VirtualServer(Route)?\s*$", re.MULTILINE)
+
+
+def preload_manifests(paths) -> int:
+    """
+    Parse single document VS/VSR yaml manifests ahead of the tests, so the helpers of this module find them cached.
+
+    Other kinds are never loaded by these helpers and are skipped without parsing, so they get no json copy in the cache dir.
+    Files that are not a single named document, like multi-document manifests, are skipped too.
+
+    :param paths: iterable of absolute paths to files
+    :return: int number of manifests loaded
+    """
+    loaded = 0
+    for path in paths:
+        if not _VS_KIND.search(pathlib.Path(path).read_bytes()):
+            continue
+        try:
+            _load_yaml_cached(path)
+            loaded += 1
+        except (yaml.YAMLError, KeyError, TypeError):
+            pass
+    return loaded
 
 
 def read_vs(custom_objects: CustomObjectsApi, namespace, name) -> object:
@@ -33,8 +442,7 @@ def create_virtual_server_from_yaml(custom_objects: CustomObjectsApi, yaml_manif
     :return: str
     """
     print("Create a VirtualServer:")
-    with open(yaml_manifest) as f:
-        dep = yaml.safe_load(f)
+    dep, _ = _load_yaml_cached(yaml_manifest)
 
     return create_virtual_server(custom_objects, dep, namespace)
 
@@ -49,21 +457,25 @@ def create_custom_items_from_yaml(custom_objects, yaml_manifest, namespace) -> {
     :return:
     """
     res = {}
+    creates = {"VirtualServer": create_virtual_server, "VirtualServerRoute": create_v_s_route}
     print("Load yaml:")
-    with open(yaml_manifest) as f:
-        docs = yaml.safe_load_all(f)
-        try:
-            for doc in docs:
-                if doc["kind"] == "VirtualServer":
-                    res["VirtualServer"] = create_virtual_server(custom_objects, doc, namespace)
-                elif doc["kind"] == "VirtualServerRoute":
-                    res["VirtualServerRoute"] = create_v_s_route(custom_objects, doc, namespace)
-        except Exception:
-            pass
+    # parse everything before any API call, so the file is not kept open during the creates
+    with open(yaml_manifest, "rb") as f:
+        docs = list(yaml.load_all(f, Loader=_SafeLoader))
+    # a trailing "---" yields an empty document
+    docs = [doc for doc in docs if doc and doc["kind"] in creates]
+
+    # the items are independent of each other, so create them concurrently
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(docs)))) as executor:
+        futures = [(doc["kind"], executor.submit(creates[doc["kind"]], custom_objects, doc, namespace)) for doc in docs]
+    # collect in manifest order, so the last item of a kind wins as before
+    for kind, future in futures:
+        res[kind] = future.result()
 
     return res
 
 
+@_retry(statuses=(429,))
 def create_virtual_server(custom_objects: CustomObjectsApi, vs, namespace) -> str:
     """
     Create a VirtualServer.
@@ -74,13 +486,9 @@ def create_virtual_server(custom_objects: CustomObjectsApi, vs, namespace) -> st
     :return: str
     """
     print("Create a VirtualServer:")
-    try:
-        custom_objects.create_namespaced_custom_object("k8s.nginx.org", "v1", namespace, "virtualservers", vs)
-        print(f"VirtualServer created with name '{vs['metadata']['name']}'")
-        return vs["metadata"]["name"]
-    except ApiException as ex:
-        logging.exception(f"Exception: {ex} occurred while creating VirtualServer: {vs['metadata']['name']}")
-        raise
+    _vs_client(custom_objects, "virtualservers").create(namespace, vs)
+    print(f"VirtualServer created with name '{vs['metadata']['name']}'")
+    return vs["metadata"]["name"]
 
 
 def delete_virtual_server(custom_objects: CustomObjectsApi, name, namespace) -> None:
@@ -94,18 +502,25 @@ def delete_virtual_server(custom_objects: CustomObjectsApi, name, namespace) ->
     """
     print(f"Delete a VirtualServer: {name}")
 
-    custom_objects.delete_namespaced_custom_object("k8s.nginx.org", "v1", namespace, "virtualservers", name)
-    ensure_item_removal(
-        custom_objects.get_namespaced_custom_object,
-        "k8s.nginx.org",
-        "v1",
-        namespace,
-        "virtualservers",
-        name,
-    )
+    _vs_client(custom_objects, "virtualservers").delete(namespace, name)
+    _wait_for_removal(custom_objects, "virtualservers", name, namespace)
     print(f"VirtualServer was removed with name '{name}'")
 
 
+def delete_virtual_servers(custom_objects: CustomObjectsApi, names, namespace) -> None:
+    """
+    Delete several independent VirtualServers concurrently, raising the first failed delete.
+
+    :param custom_objects: CustomObjectsApi
+    :param names: VirtualServer names
+    :param namespace: namespace
+    :return:
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda name: delete_virtual_server(custom_objects, name, namespace), names))
+
+
+@_retry()
 def patch_virtual_server_from_yaml(custom_objects: CustomObjectsApi, name, yaml_manifest, namespace) -> None:
     """
     Patch a VS based on yaml manifest
@@ -116,15 +531,14 @@ def patch_virtual_server_from_yaml(custom_objects: CustomObjectsApi, name, yaml_
     :return:
     """
     print(f"Update a VirtualServer: {name}, namespace: {namespace}")
-    with open(yaml_manifest) as f:
-        dep = yaml.safe_load(f)
+    dep, dep_name = _load_yaml_cached(yaml_manifest)
 
     try:
-        print(f"Try to patch VirtualServer: {dep}")
-        custom_objects.patch_namespaced_custom_object("k8s.nginx.org", "v1", namespace, "virtualservers", name, dep)
-        print(f"VirtualServer updated with name '{dep['metadata']['name']}'")
+        logging.getLogger(__name__).debug("Try to patch VirtualServer name=%s", dep_name)
+        _vs_client(custom_objects, "virtualservers").patch(namespace, name, dep)
+        print(f"VirtualServer updated with name '{dep_name}'")
     except ApiException:
-        logging.exception(f"Failed with exception while patching VirtualServer: {name}")
+        # logged by _retry once it gives up
         raise
     except Exception as ex:
         logging.exception(f"Failed with exception while patching VirtualServer: {name}, Exception: {ex.with_traceback}")
@@ -150,6 +564,7 @@ def delete_and_create_vs_from_yaml(custom_objects: CustomObjectsApi, name, yaml_
         raise
 
 
+@_retry()
 def patch_virtual_server(custom_objects: CustomObjectsApi, name, namespace, body) -> str:
     """
     Update a VirtualServer based on a dict.
@@ -161,11 +576,12 @@ def patch_virtual_server(custom_objects: CustomObjectsApi, name, namespace, body
     :return: str
     """
     print("Update a VirtualServer:")
-    custom_objects.patch_namespaced_custom_object("k8s.nginx.org", "v1", namespace, "virtualservers", name, body)
+    _vs_client(custom_objects, "virtualservers").patch(namespace, name, body)
     print(f"VirtualServer updated with a name '{body['metadata']['name']}'")
     return body["metadata"]["name"]
 
 
+@_retry()
 def patch_v_s_route_from_yaml(custom_objects: CustomObjectsApi, name, yaml_manifest, namespace) -> None:
     """
     Update a VirtualServerRoute based on yaml manifest
@@ -177,17 +593,14 @@ def patch_v_s_route_from_yaml(custom_objects: CustomObjectsApi, name, yaml_manif
     :return:
     """
     print(f"Update a VirtualServerRoute: {name}, namespace: {namespace}")
-    with open(yaml_manifest) as f:
-        dep = yaml.safe_load(f)
+    dep, dep_name = _load_yaml_cached(yaml_manifest)
     try:
-        print(f"Try to patch VirtualServerRoute: {dep}")
-        custom_objects.patch_namespaced_custom_object(
-            "k8s.nginx.org", "v1", namespace, "virtualserverroutes", name, dep
-        )
+        logging.getLogger(__name__).debug("Try to patch VirtualServerRoute name=%s", dep_name)
+        _vs_client(custom_objects, "virtualserverroutes").patch(namespace, name, dep)
         wait_before_test()
-        print(f"VirtualServerRoute updated with name '{dep['metadata']['name']}'")
+        print(f"VirtualServerRoute updated with name '{dep_name}'")
     except ApiException:
-        logging.exception(f"Failed with exception while patching VirtualServerRoute: {name}")
+        # logged by _retry once it gives up
         raise
     except Exception as ex:
         logging.exception(
@@ -197,85 +610,39 @@ def patch_v_s_route_from_yaml(custom_objects: CustomObjectsApi, name, yaml_manif
 
 
 def apply_and_assert_valid_vsr(kube_apis, namespace, name, vsr_yaml):
-    delete_and_create_v_s_route_from_yaml(
-        kube_apis.custom_objects,
-        name,
-        vsr_yaml,
-        namespace,
+    delete_v_s_route(kube_apis.custom_objects, name, namespace)
+    create_v_s_route_from_yaml(kube_apis.custom_objects, vsr_yaml, namespace)
+    vsr_info = _wait_for_vs_status(
+        kube_apis.custom_objects, namespace, "virtualserverroutes", name, "AddedOrUpdated", "Valid"
     )
-    wait_before_test(1)
-    vsr_info = read_custom_resource(
-        kube_apis.custom_objects,
-        namespace,
-        "virtualserverroutes",
-        name,
-    )
-    assert (
-        vsr_info["status"]
-        and vsr_info["status"]["reason"] == "AddedOrUpdated"
-        and vsr_info["status"]["state"] == "Valid"
-    ), vsr_info
+    _assert_status(vsr_info, "AddedOrUpdated", "Valid")
 
 
 def apply_and_assert_warning_vsr(kube_apis, namespace, name, vsr_yaml):
-    delete_and_create_v_s_route_from_yaml(
-        kube_apis.custom_objects,
-        name,
-        vsr_yaml,
-        namespace,
-    )
-    wait_before_test(1)
-    vsr_info = read_custom_resource(
-        kube_apis.custom_objects,
-        namespace,
-        "virtualserverroutes",
-        name,
+    delete_v_s_route(kube_apis.custom_objects, name, namespace)
+    create_v_s_route_from_yaml(kube_apis.custom_objects, vsr_yaml, namespace)
+    vsr_info = _wait_for_vs_status(
+        kube_apis.custom_objects, namespace, "virtualserverroutes", name, "AddedOrUpdatedWithWarning", "Warning"
     )
-    assert (
-        vsr_info["status"]
-        and vsr_info["status"]["reason"] == "AddedOrUpdatedWithWarning"
-        and vsr_info["status"]["state"] == "Warning"
-    ), vsr_info
+    _assert_status(vsr_info, "AddedOrUpdatedWithWarning", "Warning")
 
 
 def apply_and_assert_valid_vs(kube_apis, namespace, name, vs_yaml):
-    delete_and_create_vs_from_yaml(
-        kube_apis.custom_objects,
-        name,
-        vs_yaml,
-        namespace,
+    delete_virtual_server(kube_apis.custom_objects, name, namespace)
+    create_virtual_server_from_yaml(kube_apis.custom_objects, vs_yaml, namespace)
+    vs_info = _wait_for_vs_status(
+        kube_apis.custom_objects, namespace, "virtualservers", name, "AddedOrUpdated", "Valid"
     )
-    wait_before_test(1)
-    vs_info = read_custom_resource(
-        kube_apis.custom_objects,
-        namespace,
-        "virtualservers",
-        name,
-    )
-    assert (
-        vs_info["status"] and vs_info["status"]["reason"] == "AddedOrUpdated" and vs_info["status"]["state"] == "Valid"
-    ), vs_info
+    _assert_status(vs_info, "AddedOrUpdated", "Valid")
 
 
 def apply_and_assert_warning_vs(kube_apis, namespace, name, vs_yaml):
-    delete_and_create_vs_from_yaml(
-        kube_apis.custom_objects,
-        name,
-        vs_yaml,
-        namespace,
-    )
-    wait_before_test(1)
-    vs_info = read_custom_resource(
-        kube_apis.custom_objects,
-        namespace,
-        "virtualservers",
-        name,
+    delete_virtual_server(kube_apis.custom_objects, name, namespace)
+    create_virtual_server_from_yaml(kube_apis.custom_objects, vs_yaml, namespace)
+    vs_info = _wait_for_vs_status(
+        kube_apis.custom_objects, namespace, "virtualservers", name, "AddedOrUpdatedWithWarning", "Warning"
     )
-    assert (
-        vs_info["status"]
-        and vs_info["status"]["reason"] == "AddedOrUpdatedWithWarning"
-        and vs_info["status"]["state"] == "Warning"
-    ), vs_info
+    _assert_status(vs_info, "AddedOrUpdatedWithWarning", "Warning")
 
 
 def get_vs_nginx_template_conf(v1: CoreV1Api, vs_namespace, vs_name, pod_name, pod_namespace, print_log=True) -> str:
@@ -304,12 +671,12 @@ def create_v_s_route_from_yaml(custom_objects: CustomObjectsApi, yaml_manifest,
     :return: str
     """
     print("Create a VirtualServerRoute:")
-    with open(yaml_manifest) as f:
-        dep = yaml.safe_load(f)
+    dep, _ = _load_yaml_cached(yaml_manifest)
 
     return create_v_s_route(custom_objects, dep, namespace)
 
 
+@_retry(statuses=(429,))
 def create_v_s_route(custom_objects: CustomObjectsApi, vsr, namespace) -> str:
     """
     Create a VirtualServerRoute.
@@ -320,11 +687,12 @@ def create_v_s_route(custom_objects: CustomObjectsApi, vsr, namespace) -> str:
     :return: str
     """
     print("Create a VirtualServerRoute:")
-    custom_objects.create_namespaced_custom_object("k8s.nginx.org", "v1", namespace, "virtualserverroutes", vsr)
+    _vs_client(custom_objects, "virtualserverroutes").create(namespace, vsr)
     print(f"VirtualServerRoute created with a name '{vsr['metadata']['name']}'")
     return vsr["metadata"]["name"]
 
 
+@_retry()
 def patch_v_s_route(custom_objects: CustomObjectsApi, name, namespace, body) -> str:
     """
     Update a VirtualServerRoute based on a dict.
@@ -336,7 +704,7 @@ def patch_v_s_route(custom_objects: CustomObjectsApi, name, namespace, body) ->
     :return: str
     """
     print("Update a VirtualServerRoute:")
-    custom_objects.patch_namespaced_custom_object("k8s.nginx.org", "v1", namespace, "virtualserverroutes", name, body)
+    _vs_client(custom_objects, "virtualserverroutes").patch(namespace, name, body)
     print(f"VirtualServerRoute updated with a name '{body['metadata']['name']}'")
     return body["metadata"]["name"]
 
@@ -351,24 +719,24 @@ def delete_v_s_route(custom_objects: CustomObjectsApi, name, namespace) -> None:
     :return:
     """
     print(f"Delete a VirtualServerRoute: {name}")
-    custom_objects.delete_namespaced_custom_object(
-        "k8s.nginx.org",
-        "v1",
-        namespace,
-        "virtualserverroutes",
-        name,
-    )
-    ensure_item_removal(
-        custom_objects.get_namespaced_custom_object,
-        "k8s.nginx.org",
-        "v1",
-        namespace,
-        "virtualserverroutes",
-        name,
-    )
+    _vs_client(custom_objects, "virtualserverroutes").delete(namespace, name)
+    _wait_for_removal(custom_objects, "virtualserverroutes", name, namespace)
     print(f"VirtualServerRoute was removed with the name '{name}'")
 
 
+def delete_v_s_routes(custom_objects: CustomObjectsApi, names, namespace) -> None:
+    """
+    Delete several independent VirtualServerRoutes concurrently, raising the first failed delete.
+
+    :param custom_objects: CustomObjectsApi
+    :param names: VirtualServerRoute names
+    :param namespace: namespace
+    :return:
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda name: delete_v_s_route(custom_objects, name, namespace), names))
+
+
 def delete_and_create_v_s_route_from_yaml(custom_objects: CustomObjectsApi, name, yaml_manifest, namespace) -> None:
     """
     Update a VirtualServerRoute based on yaml manifest